@@ -1,20 +1,21 @@
 """心跳接收路由"""
 
-import re
 from datetime import datetime
 from typing import Any, Dict
 
 from fastapi import APIRouter, HTTPException
 
-from ..core.redis_client import redis_client
-from ..core.time_utils import get_current_time_in_timezone
+from ..core.component_id import MAX_COMPONENT_ID_LENGTH, is_valid_component_id
+from ..core.redis_client import (
+    COMPONENTS_INDEX_KEY,
+    async_redis_client,
+    encode_json,
+)
+from ..core.time_utils import get_current_time_in_timezone, parse_iso_timestamp
 from ..models.heartbeat import HeartbeatRequest
 
 router = APIRouter(prefix="/api/v1", tags=["heartbeat"])
 
-# 组件ID格式验证：只允许字母、数字、下划线、连字符
-COMPONENT_ID_PATTERN = re.compile(r"^[a-zA-Z0-9_-]+$")
-
 
 @router.post("/heartbeat/{component_id}")
 async def receive_heartbeat(
@@ -32,10 +33,13 @@ async def receive_heartbeat(
         处理结果
     """
     # 验证 component_id 格式
-    if not COMPONENT_ID_PATTERN.match(component_id):
+    if not is_valid_component_id(component_id):
         raise HTTPException(
             status_code=400,
-            detail="组件ID格式无效，只允许字母、数字、下划线、连字符"
+            detail=(
+                "组件ID格式无效，只允许字母、数字、下划线、连字符，"
+                f"且长度不超过 {MAX_COMPONENT_ID_LENGTH}"
+            )
         )
 
     # 构建心跳数据
@@ -44,13 +48,18 @@ async def receive_heartbeat(
         "component_id": component_id,
         "process_exists": request.process_exists,
         "timestamp": request.timestamp,
+        # 接收时解析一次，状态查询直接做数值比较
+        "timestamp_epoch": parse_iso_timestamp(request.timestamp),
         "declared_level": request.declared_level,
         "received_at": current_time.isoformat()
     }
 
-    # 存储到 Redis，TTL=300秒
+    # 存储到 Redis，TTL=300秒；与组件索引更新合并为一次往返
     redis_key = f"heartbeat:{component_id}"
-    redis_client.set_json(redis_key, heartbeat_data, ttl=300)
+    pipe = async_redis_client.pipeline()
+    pipe.setex(redis_key, 300, encode_json(heartbeat_data))
+    pipe.sadd(COMPONENTS_INDEX_KEY, component_id)
+    await pipe.execute()
 
     return {
         "success": True,
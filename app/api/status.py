@@ -1,19 +1,21 @@
 """统一状态查询路由"""
 
+import asyncio
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
-
-from fastapi import APIRouter, HTTPException
-
-from ..core.redis_client import redis_client
-from ..core.time_utils import get_current_time_in_timezone
-from ..models.status import (
-    ComponentStatus,
-    FileMonitorStatus,
-    HeartbeatStatus,
-    LevelStatus,
-    StatusResponse,
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from redis.exceptions import NoScriptError
+
+from ..core.redis_client import (
+    COMPONENTS_INDEX_KEY,
+    async_redis_client,
+    encode_json,
 )
+from ..core.time_utils import get_current_time_in_timezone, parse_iso_timestamp
+from ..models.status import ComponentStatus, StatusResponse
 
 router = APIRouter(prefix="/api/v1", tags=["status"])
 
@@ -29,13 +31,31 @@ STATUS_PRIORITY = {
 # 心跳间隔（秒）- 用于计算心跳状态
 DEFAULT_HEARTBEAT_INTERVAL = 30
 
+# /status 响应缓存：(写入时的 monotonic 时间, 序列化后的响应体)，进程内共享
+_status_cache: Optional[Tuple[float, bytes]] = None
+# 并发的缓存未命中合并为一次 Redis 查询
+_status_cache_lock = asyncio.Lock()
+
+# /status/{component_id} 进行中的查询（组件ID -> 查询任务）
+_component_inflight: Dict[str, "asyncio.Task[ComponentStatus]"] = {}
+
+# 状态汇总 Lua 脚本（服务端计算各组件综合状态）
+STATUS_SUMMARY_SCRIPT_PATH = (
+    Path(__file__).resolve().parent.parent / "lua" / "status_summary.lua"
+)
+_status_summary_sha: Optional[str] = None
+
 
-def calculate_heartbeat_status(heartbeat_data: Dict[str, Any]) -> str:
+def calculate_heartbeat_status(
+    heartbeat_data: Dict[str, Any],
+    current_time: Optional[datetime] = None
+) -> str:
     """
     根据心跳数据计算状态
 
     Args:
         heartbeat_data: Redis 中的心跳数据
+        current_time: 当前时间，批量计算时由调用方传入以复用，默认取当前时间
 
     Returns:
         状态字符串：healthy / warning / critical / offline
@@ -51,25 +71,29 @@ def calculate_heartbeat_status(heartbeat_data: Dict[str, Any]) -> str:
     if not last_heartbeat_str:
         return "offline"
 
-    try:
-        last_heartbeat = datetime.fromisoformat(last_heartbeat_str)
-        current_time = get_current_time_in_timezone()
+    # 优先使用接收时已解析的 epoch，旧数据回退到解析 ISO 字符串
+    last_heartbeat_epoch = heartbeat_data.get("timestamp_epoch")
+    if last_heartbeat_epoch is None:
+        last_heartbeat_epoch = parse_iso_timestamp(last_heartbeat_str)
+        if last_heartbeat_epoch is None:
+            return "offline"
 
-        # 计算时间差（秒）
-        time_diff = (current_time - last_heartbeat).total_seconds()
+    current_epoch = (
+        current_time.timestamp() if current_time is not None else time.time()
+    )
 
-        # 根据时间差判断状态
-        interval = DEFAULT_HEARTBEAT_INTERVAL
+    # 计算时间差（秒）
+    time_diff = current_epoch - last_heartbeat_epoch
 
-        if time_diff < interval * 1.5:
-            return "healthy"
-        elif time_diff < interval * 3:
-            return "warning"
-        else:
-            return "critical"
+    # 根据时间差判断状态
+    interval = DEFAULT_HEARTBEAT_INTERVAL
 
-    except (ValueError, TypeError):
-        return "offline"
+    if time_diff < interval * 1.5:
+        return "healthy"
+    elif time_diff < interval * 3:
+        return "warning"
+    else:
+        return "critical"
 
 
 def get_worst_status(statuses: List[str]) -> str:
@@ -89,144 +113,334 @@ def get_worst_status(statuses: List[str]) -> str:
     return min(statuses, key=lambda s: STATUS_PRIORITY.get(s, -1))
 
 
-def build_component_status(component_id: str) -> ComponentStatus:
+def build_component_status_dict(
+    component_id: str,
+    heartbeat_data: Optional[Dict[str, Any]],
+    file_status_data: Optional[Dict[str, Any]],
+    level_status_data: Optional[Dict[str, Any]],
+    current_time: Optional[datetime] = None
+) -> Dict[str, Any]:
     """
-    构建单个组件的聚合状态
+    根据已查询的 Redis 数据构建单个组件的聚合状态（普通字典，结构同 ComponentStatus）
 
     Args:
         component_id: 组件ID
+        heartbeat_data: 心跳数据
+        file_status_data: 文件监控状态数据
+        level_status_data: 等级验证状态数据
+        current_time: 当前时间，用于计算心跳状态
 
     Returns:
-        组件聚合状态
+        组件聚合状态字典
     """
-    # 查询各类状态
-    heartbeat_data = redis_client.get_json(f"heartbeat:{component_id}")
-    file_status_data = redis_client.get_json(f"file_status:{component_id}")
-    level_status_data = redis_client.get_json(f"level_status:{component_id}")
+    all_statuses: List[str] = []
 
     # 构建心跳状态
-    heartbeat_status: Optional[HeartbeatStatus] = None
+    heartbeat_status: Optional[Dict[str, Any]] = None
     if heartbeat_data:
-        hb_status = calculate_heartbeat_status(heartbeat_data)
-        heartbeat_status = HeartbeatStatus(
-            component_id=component_id,
-            process_exists=heartbeat_data.get("process_exists", False),
-            last_heartbeat_at=heartbeat_data.get("timestamp", ""),
-            status=hb_status,
-            declared_level=heartbeat_data.get("declared_level")
-        )
-
-    # 构建文件状态
-    file_status: Optional[FileMonitorStatus] = None
+        hb_status = calculate_heartbeat_status(heartbeat_data, current_time)
+        heartbeat_status = {
+            "component_id": component_id,
+            "process_exists": heartbeat_data.get("process_exists", False),
+            "last_heartbeat_at": heartbeat_data.get("timestamp", ""),
+            "status": hb_status,
+            "declared_level": heartbeat_data.get("declared_level")
+        }
+        all_statuses.append(hb_status)
+
+    # 文件状态与等级状态由定时任务按模型结构写入，直接透传
     if file_status_data:
-        file_status = FileMonitorStatus(**file_status_data)
-
-    # 构建等级状态
-    level_status: Optional[LevelStatus] = None
-    if level_status_data:
-        level_status = LevelStatus(**level_status_data)
-
-    # 计算综合状态
-    all_statuses: List[str] = []
-    if heartbeat_status:
-        all_statuses.append(heartbeat_status.status)
-    if file_status:
         all_statuses.append(
-            "healthy" if file_status.overall_file_health else "warning"
+            "healthy" if file_status_data.get("overall_file_health") else "warning"
         )
-    if level_status:
+    else:
+        file_status_data = None
+
+    if level_status_data:
         all_statuses.append(
-            "healthy" if level_status.compliant else "warning"
+            "healthy" if level_status_data.get("compliant") else "warning"
         )
+    else:
+        level_status_data = None
 
+    # 计算综合状态
     overall_status = get_worst_status(all_statuses) if all_statuses else "unknown"
 
-    return ComponentStatus(
-        component_id=component_id,
-        heartbeat=heartbeat_status,
-        file_status=file_status,
-        level_status=level_status,
-        overall_status=overall_status
-    )
+    return {
+        "component_id": component_id,
+        "heartbeat": heartbeat_status,
+        "file_status": file_status_data,
+        "level_status": level_status_data,
+        "overall_status": overall_status
+    }
+
+
+def build_component_status(
+    component_id: str,
+    heartbeat_data: Optional[Dict[str, Any]],
+    file_status_data: Optional[Dict[str, Any]],
+    level_status_data: Optional[Dict[str, Any]],
+    current_time: Optional[datetime] = None
+) -> ComponentStatus:
+    """
+    根据已查询的 Redis 数据构建单个组件的聚合状态
 
+    Args:
+        component_id: 组件ID
+        heartbeat_data: 心跳数据
+        file_status_data: 文件监控状态数据
+        level_status_data: 等级验证状态数据
+        current_time: 当前时间，用于计算心跳状态
 
-@router.get("/status", response_model=StatusResponse)
-async def get_all_status() -> StatusResponse:
+    Returns:
+        组件聚合状态
     """
-    获取所有组件的聚合状态
+    return ComponentStatus(**build_component_status_dict(
+        component_id,
+        heartbeat_data,
+        file_status_data,
+        level_status_data,
+        current_time
+    ))
+
+
+async def query_all_status() -> Dict[str, Any]:
+    """
+    从 Redis 查询所有组件的聚合状态
+
+    直接构建普通字典（结构同 StatusResponse），不经过 Pydantic 模型校验。
 
     Returns:
         包含所有组件心跳、文件状态、等级状态的聚合响应
     """
-    # 获取所有心跳 key
-    heartbeat_keys = redis_client.get_keys_by_pattern("heartbeat:*")
-
-    # 提取组件ID列表
-    component_ids: List[str] = []
-    for key in heartbeat_keys:
-        # key 格式: heartbeat:{component_id}
-        component_id = key.replace("heartbeat:", "")
-        component_ids.append(component_id)
-
-    # 也去 file_status 和 level_status 中查找组件
-    file_keys = redis_client.get_keys_by_pattern("file_status:*")
-    for key in file_keys:
-        component_id = key.replace("file_status:", "")
-        if component_id not in component_ids:
-            component_ids.append(component_id)
-
-    level_keys = redis_client.get_keys_by_pattern("level_status:*")
-    for key in level_keys:
-        component_id = key.replace("level_status:", "")
-        if component_id not in component_ids:
-            component_ids.append(component_id)
-
-    # 构建每个组件的状态
-    components: List[ComponentStatus] = []
-    for component_id in sorted(component_ids):
-        component_status = build_component_status(component_id)
-        components.append(component_status)
+    # 从组件索引获取组件ID列表（心跳接收与定时任务写入时维护）
+    component_ids = sorted(
+        await async_redis_client.smembers(COMPONENTS_INDEX_KEY)
+    )
 
-    # 统计各类状态数量
-    healthy_count = sum(1 for c in components if c.overall_status == "healthy")
-    warning_count = sum(1 for c in components if c.overall_status == "warning")
-    critical_count = sum(
-        1 for c in components
-        if c.overall_status in ["critical", "offline"]
+    # 一次 MGET 批量查询所有组件的各类状态，往返次数与组件数量无关
+    count = len(component_ids)
+    values = await async_redis_client.mget_json(
+        [f"heartbeat:{c}" for c in component_ids]
+        + [f"file_status:{c}" for c in component_ids]
+        + [f"level_status:{c}" for c in component_ids]
     )
+    heartbeat_list = values[:count]
+    file_status_list = values[count:2 * count]
+    level_status_list = values[2 * count:]
 
+    # 本次查询统一使用同一时间计算心跳状态
     current_time = get_current_time_in_timezone()
 
-    return StatusResponse(
-        components=components,
-        total_count=len(components),
-        healthy_count=healthy_count,
-        warning_count=warning_count,
-        critical_count=critical_count,
-        queried_at=current_time.isoformat()
+    # 构建每个组件的状态，同时统计各类状态数量
+    components: List[Dict[str, Any]] = []
+    counts: Dict[str, int] = {}
+    stale_ids: List[str] = []
+    for component_id, heartbeat_data, file_status_data, level_status_data in zip(
+        component_ids, heartbeat_list, file_status_list, level_status_list
+    ):
+        # 索引中的组件可能已无任何数据（如心跳已过期），跳过并从索引移除
+        if not any([heartbeat_data, file_status_data, level_status_data]):
+            stale_ids.append(component_id)
+            continue
+
+        component_status = build_component_status_dict(
+            component_id,
+            heartbeat_data,
+            file_status_data,
+            level_status_data,
+            current_time
+        )
+        components.append(component_status)
+
+        overall_status = component_status["overall_status"]
+        counts[overall_status] = counts.get(overall_status, 0) + 1
+
+    # 清理索引，避免已失效的组件ID无限累积；
+    # 若在 MGET 之后恰好收到新心跳，下次写入时会重新加入索引
+    if stale_ids:
+        await async_redis_client.srem(COMPONENTS_INDEX_KEY, *stale_ids)
+
+    return {
+        "components": components,
+        "total_count": len(components),
+        "healthy_count": counts.get("healthy", 0),
+        "warning_count": counts.get("warning", 0),
+        "critical_count": counts.get("critical", 0) + counts.get("offline", 0),
+        "queried_at": current_time.isoformat()
+    }
+
+
+@router.get("/status", responses={200: {"model": StatusResponse}})
+async def get_all_status(
+    ttl_ms: int = Query(
+        2000,
+        ge=0,
+        le=60000,
+        description="响应缓存有效期（毫秒），0 表示跳过缓存直接查询"
     )
+) -> Response:
+    """
+    获取所有组件的聚合状态
 
+    响应结构同 StatusResponse，由 orjson 直接序列化。
+    轮询方（如监控面板）在 ttl_ms 内重复请求时直接返回进程内缓存的响应体，
+    并发的缓存未命中只触发一次 Redis 查询。
 
-@router.get("/status/{component_id}")
-async def get_component_status(component_id: str) -> ComponentStatus:
+    Args:
+        ttl_ms: 响应缓存有效期（毫秒），0 表示跳过缓存
+
+    Returns:
+        包含所有组件心跳、文件状态、等级状态的聚合响应
     """
-    获取单个组件的详细状态
+    global _status_cache
+
+    if ttl_ms == 0:
+        body = encode_json(await query_all_status())
+        return Response(content=body, media_type="application/json")
+
+    ttl = ttl_ms / 1000
+
+    cached = _status_cache
+    if cached is None or time.monotonic() - cached[0] >= ttl:
+        async with _status_cache_lock:
+            # 等待锁期间其他请求可能已刷新缓存
+            cached = _status_cache
+            if cached is None or time.monotonic() - cached[0] >= ttl:
+                body = encode_json(await query_all_status())
+                # 查询完成后再记录时间，缓存有效期从数据获取时刻算起
+                cached = (time.monotonic(), body)
+                _status_cache = cached
+
+    return Response(content=cached[1], media_type="application/json")
+
+
+async def load_status_summary_script() -> str:
+    """
+    加载状态汇总 Lua 脚本到 Redis 脚本缓存
+
+    Returns:
+        脚本 SHA1
+    """
+    global _status_summary_sha
+
+    script = STATUS_SUMMARY_SCRIPT_PATH.read_text(encoding="utf-8")
+    _status_summary_sha = await async_redis_client.script_load(script)
+    return _status_summary_sha
+
+
+@router.get("/status-summary")
+async def get_status_summary() -> Dict[str, Any]:
+    """
+    获取所有组件的综合状态概览
+
+    路径不放在 /status/ 下，避免与 ID 为 summary 的组件详情冲突。
+
+    由 Lua 脚本在 Redis 服务端一次性完成所有组件的状态计算，
+    不返回文件/等级详情，适合只需要状态概览的轮询方。
+
+    Returns:
+        各组件综合状态及数量统计
+    """
+    sha = _status_summary_sha or await load_status_summary_script()
+    try:
+        rows = await async_redis_client.evalsha(
+            sha,
+            [COMPONENTS_INDEX_KEY],
+            [DEFAULT_HEARTBEAT_INTERVAL]
+        )
+    except NoScriptError:
+        # Redis 重启或脚本缓存被清空后重新加载
+        sha = await load_status_summary_script()
+        rows = await async_redis_client.evalsha(
+            sha,
+            [COMPONENTS_INDEX_KEY],
+            [DEFAULT_HEARTBEAT_INTERVAL]
+        )
+
+    # 脚本中 1=合规, 0=不合规, -1=无数据
+    compliance = {1: True, 0: False, -1: None}
+
+    components: List[Dict[str, Any]] = []
+    counts: Dict[str, int] = {}
+    for component_id, overall_status, hb_status, file_ok, level_ok in rows:
+        components.append({
+            "component_id": component_id,
+            "overall_status": overall_status,
+            "heartbeat_status": hb_status or None,
+            "file_compliant": compliance[file_ok],
+            "level_compliant": compliance[level_ok]
+        })
+        counts[overall_status] = counts.get(overall_status, 0) + 1
+
+    current_time = get_current_time_in_timezone()
+
+    return {
+        "components": components,
+        "total_count": len(components),
+        "healthy_count": counts.get("healthy", 0),
+        "warning_count": counts.get("warning", 0),
+        "critical_count": counts.get("critical", 0) + counts.get("offline", 0),
+        "queried_at": current_time.isoformat()
+    }
+
+
+async def query_component_status(component_id: str) -> ComponentStatus:
+    """
+    从 Redis 查询单个组件的详细状态
 
     Args:
         component_id: 组件ID
 
     Returns:
         组件聚合状态
+
+    Raises:
+        HTTPException: 组件不存在（404）
     """
-    # 检查是否存在该组件的任何数据
-    heartbeat_data = redis_client.get_json(f"heartbeat:{component_id}")
-    file_status_data = redis_client.get_json(f"file_status:{component_id}")
-    level_status_data = redis_client.get_json(f"level_status:{component_id}")
+    # 一次 MGET 查询该组件的全部数据
+    heartbeat_data, file_status_data, level_status_data = await async_redis_client.mget_json([
+        f"heartbeat:{component_id}",
+        f"file_status:{component_id}",
+        f"level_status:{component_id}",
+    ])
 
+    # 检查是否存在该组件的任何数据
     if not any([heartbeat_data, file_status_data, level_status_data]):
         raise HTTPException(
             status_code=404,
             detail=f"组件不存在: {component_id}"
         )
 
-    return build_component_status(component_id)
+    return build_component_status(
+        component_id,
+        heartbeat_data,
+        file_status_data,
+        level_status_data
+    )
+
+
+@router.get("/status/{component_id}")
+async def get_component_status(component_id: str) -> ComponentStatus:
+    """
+    获取单个组件的详细状态
+
+    同一组件的并发请求共享进行中的同一次查询。
+
+    Args:
+        component_id: 组件ID
+
+    Returns:
+        组件聚合状态
+    """
+    # 查找与创建之间没有 await，在单线程事件循环中无需加锁
+    task = _component_inflight.get(component_id)
+    if task is None:
+        task = asyncio.ensure_future(query_component_status(component_id))
+        _component_inflight[component_id] = task
+        task.add_done_callback(
+            lambda _: _component_inflight.pop(component_id, None)
+        )
+
+    # shield：单个请求被取消时不影响其他等待同一查询的请求
+    return await asyncio.shield(task)
@@ -0,0 +1,24 @@
+"""组件ID格式校验（服务端与模拟组件共用，仅依赖标准库）"""
+
+import string
+
+# 组件ID格式验证：只允许字母、数字、下划线、连字符
+COMPONENT_ID_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
+# 组件ID最大长度
+MAX_COMPONENT_ID_LENGTH = 128
+
+
+def is_valid_component_id(component_id: str) -> bool:
+    """
+    校验组件ID格式（字符集判断，避免每次请求执行正则匹配）
+
+    Args:
+        component_id: 组件ID
+
+    Returns:
+        是否有效
+    """
+    return (
+        0 < len(component_id) <= MAX_COMPONENT_ID_LENGTH
+        and COMPONENT_ID_CHARS.issuperset(component_id)
+    )
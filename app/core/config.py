@@ -1,16 +1,21 @@
 """配置管理模块 - 加载环境变量和YAML配置"""
 
+import copy
 import os
+from functools import lru_cache
 from typing import Any, Dict
 
 import yaml
 from pydantic_settings import BaseSettings
 
+from .time_utils import time_str_to_seconds
+
 
 class Settings(BaseSettings):
     """环境变量配置"""
 
     redis_url: str = "redis://localhost:6379/0"
+    redis_max_connections: int = 50
     file_monitor_plan_path: str = "app/config/file_monitor_plan.yaml"
     level_schedule_path: str = "app/config/level_schedule.yaml"
 
@@ -20,22 +25,52 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
+# 优先使用 libyaml C 扩展加载器，未编译 libyaml 时回退到纯 Python 实现
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@lru_cache(maxsize=16)
+def _load_yaml_file(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """
+    解析YAML文件，按 (路径, 修改时间) 缓存
+
+    Args:
+        path: YAML文件路径
+        mtime_ns: 文件修改时间（纳秒），仅作为缓存键
+
+    Returns:
+        解析后的字典数据
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
+def _get_mtime_ns(path: str) -> int:
+    """
+    获取配置文件修改时间（纳秒），作为缓存键
+
+    Raises:
+        FileNotFoundError: 配置文件不存在
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"配置文件不存在: {path}") from None
+
 
 def load_yaml_config(path: str) -> Dict[str, Any]:
     """
     加载YAML配置文件
 
+    文件未修改时直接返回缓存的解析结果，返回值在调用方之间共享，不应修改。
+
     Args:
         path: YAML文件路径
 
     Returns:
         解析后的字典数据
     """
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"配置文件不存在: {path}")
-
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+    return _load_yaml_file(path, _get_mtime_ns(path))
 
 
 def get_file_monitor_plan() -> Dict[str, Any]:
@@ -43,6 +78,37 @@ def get_file_monitor_plan() -> Dict[str, Any]:
     return load_yaml_config(settings.file_monitor_plan_path)
 
 
+@lru_cache(maxsize=4)
+def _load_level_schedule(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """
+    解析运行等级调度配置，并为每条规则预先计算 _start_sec / _end_sec（当天秒数）
+
+    在 YAML 解析结果的副本上添加字段，不修改 _load_yaml_file 共享的缓存；
+    结果同样按 (路径, 修改时间) 缓存，在调用方之间共享，不应修改。
+
+    Args:
+        path: YAML文件路径
+        mtime_ns: 文件修改时间（纳秒），仅作为缓存键
+
+    Returns:
+        带预计算字段的调度配置
+    """
+    config = copy.deepcopy(_load_yaml_file(path, mtime_ns))
+
+    for component in config.get("components", []):
+        for rule in component.get("rules", []):
+            rule["_start_sec"] = time_str_to_seconds(rule["start_time"])
+            rule["_end_sec"] = time_str_to_seconds(rule["end_time"])
+
+    return config
+
+
 def get_level_schedule() -> Dict[str, Any]:
-    """获取运行等级调度配置"""
-    return load_yaml_config(settings.level_schedule_path)
+    """
+    获取运行等级调度配置
+
+    每条规则带有预先计算的 _start_sec / _end_sec（当天秒数），
+    配置文件未修改时直接复用缓存，无需重复解析时间字符串。
+    """
+    path = settings.level_schedule_path
+    return _load_level_schedule(path, _get_mtime_ns(path))
@@ -1,12 +1,31 @@
-"""Redis 连接管理 - 全局单例模式"""
+"""Redis 连接管理 - 全局单例模式
 
-import json
-from typing import Any, Dict, List, Optional
+- RedisClient: 同步客户端，供后台定时任务线程使用
+- AsyncRedisClient: 异步客户端，供 FastAPI 请求处理使用，避免阻塞事件循环
+"""
 
+from typing import Any, Dict, List, Optional, Set, Union
+
+import orjson
 import redis
+import redis.asyncio as aioredis
+from redis.asyncio.client import Pipeline as AsyncPipeline
 
 from .config import settings
 
+# 组件ID索引（Redis SET），替代按模式扫描 key
+COMPONENTS_INDEX_KEY = "components:index"
+
+
+def encode_json(value: Any) -> bytes:
+    """将数据序列化为 UTF-8 JSON 字节串（可直接写入 Redis）"""
+    return orjson.dumps(value)
+
+
+def decode_json(data: Union[str, bytes]) -> Any:
+    """解析 Redis 中读取的 JSON 数据"""
+    return orjson.loads(data)
+
 
 class RedisClient:
     """Redis 客户端封装"""
@@ -37,6 +56,18 @@ class RedisClient:
             self.connect()
         return self._client
 
+    def pipeline(self, transaction: bool = False) -> redis.client.Pipeline:
+        """
+        创建 pipeline，批量发送命令以减少往返次数
+
+        Args:
+            transaction: 是否以 MULTI/EXEC 事务执行
+
+        Returns:
+            pipeline 对象，需调用 execute()
+        """
+        return self.get_client().pipeline(transaction=transaction)
+
     def set_json(
         self,
         key: str,
@@ -55,7 +86,7 @@ class RedisClient:
             是否成功
         """
         client = self.get_client()
-        json_str = json.dumps(value, ensure_ascii=False)
+        json_str = encode_json(value)
 
         if ttl is not None:
             return client.setex(key, ttl, json_str)
@@ -78,21 +109,144 @@ class RedisClient:
         if data is None:
             return None
 
-        return json.loads(data)
+        return decode_json(data)
+
+
+class AsyncRedisClient:
+    """异步 Redis 客户端封装（基于 redis.asyncio 连接池）"""
+
+    _instance: Optional["AsyncRedisClient"] = None
+    _client: Optional[aioredis.Redis] = None
+
+    def __new__(cls) -> "AsyncRedisClient":
+        """单例模式"""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def _create_client(self) -> aioredis.Redis:
+        """创建带连接池的异步客户端"""
+        return aioredis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            max_connections=settings.redis_max_connections
+        )
+
+    async def connect(self) -> None:
+        """
+        建立 Redis 连接池
+        """
+        self._client = self._create_client()
+        # 验证连接
+        await self._client.ping()
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def get_client(self) -> aioredis.Redis:
+        """获取异步 Redis 客户端实例（未连接时惰性创建）"""
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    def pipeline(self, transaction: bool = False) -> AsyncPipeline:
+        """
+        创建异步 pipeline
+
+        Args:
+            transaction: 是否以 MULTI/EXEC 事务执行
+
+        Returns:
+            pipeline 对象，需 await execute()
+        """
+        return self.get_client().pipeline(transaction=transaction)
+
+    async def mget_json(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        批量获取多个 key 的 JSON 数据（单次 MGET）
+
+        Args:
+            keys: Redis key 列表
+
+        Returns:
+            与 keys 顺序一致的字典列表，不存在的 key 对应 None
+        """
+        if not keys:
+            return []
+
+        client = self.get_client()
+        return [
+            decode_json(data) if data is not None else None
+            for data in await client.mget(keys)
+        ]
+
+    async def smembers(self, key: str) -> Set[str]:
+        """
+        获取 SET 的全部成员
+
+        Args:
+            key: Redis key
+
+        Returns:
+            成员集合
+        """
+        client = self.get_client()
+        return await client.smembers(key)
+
+    async def srem(self, key: str, *members: str) -> int:
+        """
+        从 SET 中移除成员
+
+        Args:
+            key: Redis key
+            members: 要移除的成员
+
+        Returns:
+            实际移除的成员数量
+        """
+        client = self.get_client()
+        return await client.srem(key, *members)
 
-    def get_keys_by_pattern(self, pattern: str) -> List[str]:
+    async def script_load(self, script: str) -> str:
         """
-        按模式获取所有匹配的 key
+        将 Lua 脚本加载到 Redis 脚本缓存
 
         Args:
-            pattern: 匹配模式，如 "heartbeat:*"
+            script: Lua 脚本内容
 
         Returns:
-            key 列表
+            脚本 SHA1，用于 evalsha
+        """
+        client = self.get_client()
+        return await client.script_load(script)
+
+    async def evalsha(
+        self,
+        sha: str,
+        keys: List[str],
+        args: List[Any]
+    ) -> Any:
+        """
+        执行已缓存的 Lua 脚本
+
+        Args:
+            sha: 脚本 SHA1
+            keys: 脚本 KEYS 参数
+            args: 脚本 ARGV 参数
+
+        Returns:
+            脚本返回值
+
+        Raises:
+            redis.exceptions.NoScriptError: 脚本不在 Redis 缓存中
         """
         client = self.get_client()
-        return list(client.scan_iter(match=pattern))
+        return await client.evalsha(sha, len(keys), *keys, *args)
 
 
 # 全局 Redis 客户端实例
 redis_client = RedisClient()
+async_redis_client = AsyncRedisClient()
@@ -1,11 +1,15 @@
 """时间处理工具 - 跨天逻辑、Cron解析"""
 
-from datetime import datetime, time, timedelta
-from typing import Dict, List, Optional
+from datetime import datetime, time, timedelta, tzinfo
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
 
-import pytz
 from croniter import croniter
 
+# 默认时区
+DEFAULT_TIMEZONE = "Asia/Shanghai"
+
 
 def parse_time(time_str: str) -> time:
     """
@@ -21,18 +25,32 @@ def parse_time(time_str: str) -> time:
     return time(hour, minute)
 
 
+def time_str_to_seconds(time_str: str) -> int:
+    """
+    将 "HH:MM" 字符串转换为当天的秒数
+
+    Args:
+        time_str: 时间字符串，如 "09:15"
+
+    Returns:
+        从 00:00 起的秒数，如 33300
+    """
+    parsed = parse_time(time_str)
+    return parsed.hour * 3600 + parsed.minute * 60
+
+
 def is_time_in_range(
-    check_time: time,
-    start_time: time,
-    end_time: time
+    check_time: float,
+    start_time: float,
+    end_time: float
 ) -> bool:
     """
     判断时间是否在给定范围内（支持跨天）
 
     Args:
-        check_time: 要检查的时间
-        start_time: 范围开始时间
-        end_time: 范围结束时间
+        check_time: 要检查的时间（当天秒数）
+        start_time: 范围开始时间（当天秒数）
+        end_time: 范围结束时间（当天秒数）
 
     Returns:
         是否在范围内
@@ -49,7 +67,21 @@ def is_time_in_range(
         return check_time >= start_time or check_time <= end_time
 
 
-def get_current_time_in_timezone(timezone: str = "Asia/Shanghai") -> datetime:
+@lru_cache(maxsize=None)
+def get_timezone(timezone: str = DEFAULT_TIMEZONE) -> ZoneInfo:
+    """
+    获取时区对象（按名称缓存）
+
+    Args:
+        timezone: 时区名称
+
+    Returns:
+        ZoneInfo 时区对象
+    """
+    return ZoneInfo(timezone)
+
+
+def get_current_time_in_timezone(timezone: str = DEFAULT_TIMEZONE) -> datetime:
     """
     获取指定时区的当前时间
 
@@ -59,8 +91,28 @@ def get_current_time_in_timezone(timezone: str = "Asia/Shanghai") -> datetime:
     Returns:
         当前时间的 datetime 对象
     """
-    tz = pytz.timezone(timezone)
-    return datetime.now(tz)
+    return datetime.now(get_timezone(timezone))
+
+
+def parse_iso_timestamp(timestamp: str) -> Optional[float]:
+    """
+    将带时区的 ISO8601 时间戳解析为 epoch 秒
+
+    Args:
+        timestamp: ISO8601 格式时间戳
+
+    Returns:
+        epoch 秒；无法解析或缺少时区信息时返回 None
+    """
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except (ValueError, TypeError):
+        return None
+
+    if parsed.tzinfo is None:
+        return None
+
+    return parsed.timestamp()
 
 
 def is_cron_due(
@@ -84,6 +136,43 @@ def is_cron_due(
     return next_trigger <= current_time
 
 
+@lru_cache(maxsize=512)
+def _cron_bounds_at_minute(
+    cron_expr: str,
+    minute_epoch: int,
+    tz: tzinfo
+) -> Tuple[datetime, datetime]:
+    """
+    计算指定分钟前后最近的 cron 触发时间（带缓存）
+
+    以该分钟的第 30 秒为基准，保证同一分钟内任意时刻结果一致
+    （cron 表达式的最小粒度为分钟）。
+    """
+    base_time = datetime.fromtimestamp(minute_epoch * 60 + 30, tz)
+    itr = croniter(cron_expr, base_time)
+    return itr.get_prev(datetime), itr.get_next(datetime)
+
+
+def get_cron_bounds(
+    cron_expr: str,
+    current_time: datetime
+) -> Tuple[datetime, datetime]:
+    """
+    获取当前时间前后最近的 cron 触发时间
+
+    结果按 (cron 表达式, 所在分钟, 时区) 缓存，同一分钟内相同表达式只解析一次。
+
+    Args:
+        cron_expr: Cron 表达式
+        current_time: 当前时间（带时区）
+
+    Returns:
+        (上次触发时间, 下次触发时间)
+    """
+    minute_epoch = int(current_time.timestamp() // 60)
+    return _cron_bounds_at_minute(cron_expr, minute_epoch, current_time.tzinfo)
+
+
 def find_matching_schedule_rule(
     rules: List[Dict],
     current_time: datetime
@@ -92,19 +181,30 @@ def find_matching_schedule_rule(
     从规则列表中查找当前时间匹配的规则
 
     Args:
-        rules: 规则列表，每个规则包含 start_time, end_time
+        rules: 规则列表，每个规则包含 start_time, end_time，
+            以及配置加载时预先计算的 _start_sec, _end_sec（可选）
         current_time: 当前时间
 
     Returns:
         匹配的规则字典，或 None
     """
-    current_time_only = current_time.time()
+    # 当天秒数，保留秒与微秒以保持与规则边界的精确比较
+    check_sec = (
+        current_time.hour * 3600
+        + current_time.minute * 60
+        + current_time.second
+        + current_time.microsecond / 1_000_000
+    )
 
     for rule in rules:
-        start_time = parse_time(rule["start_time"])
-        end_time = parse_time(rule["end_time"])
-
-        if is_time_in_range(current_time_only, start_time, end_time):
+        start_sec = rule.get("_start_sec")
+        if start_sec is None:
+            start_sec = time_str_to_seconds(rule["start_time"])
+        end_sec = rule.get("_end_sec")
+        if end_sec is None:
+            end_sec = time_str_to_seconds(rule["end_time"])
+
+        if is_time_in_range(check_sec, start_sec, end_sec):
             return rule
 
     return None
@@ -0,0 +1,100 @@
+-- 组件状态汇总脚本：在 Redis 服务端完成心跳状态计算与综合状态合并
+--
+-- KEYS[1]: 组件ID索引 SET（components:index）
+-- ARGV[1]: 心跳间隔（秒）
+--
+-- 返回: 每个组件一行 { component_id, overall_status, heartbeat_status, file_ok, level_ok }
+--   heartbeat_status: 无心跳数据时为空字符串
+--   file_ok / level_ok: 1=合规, 0=不合规, -1=无数据
+--   没有任何数据的组件（如心跳已过期）不返回，并从索引中移除
+--
+-- 注意：脚本内部按组件ID拼接 key，仅适用于单机 Redis（非 Cluster）
+
+local interval = tonumber(ARGV[1])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+
+-- 状态优先级（与 app/api/status.py 的 STATUS_PRIORITY 一致）
+local priority = { offline = 0, critical = 1, warning = 2, healthy = 3 }
+
+-- 与 calculate_heartbeat_status 逻辑一致
+local function heartbeat_status(hb)
+    if hb.process_exists ~= true then
+        return 'critical'
+    end
+
+    -- 使用接收时已解析的 epoch；时间戳无法解析（或缺少时区）时为 null
+    local last_heartbeat = hb.timestamp_epoch
+    if type(last_heartbeat) ~= 'number' then
+        return 'offline'
+    end
+
+    local time_diff = now - last_heartbeat
+    if time_diff < interval * 1.5 then
+        return 'healthy'
+    elseif time_diff < interval * 3 then
+        return 'warning'
+    end
+    return 'critical'
+end
+
+local function decode(raw)
+    if not raw then
+        return nil
+    end
+    local data = cjson.decode(raw)
+    if type(data) ~= 'table' or next(data) == nil then
+        return nil
+    end
+    return data
+end
+
+local result = {}
+local component_ids = redis.call('SMEMBERS', KEYS[1])
+table.sort(component_ids)
+
+for _, component_id in ipairs(component_ids) do
+    local values = redis.call(
+        'MGET',
+        'heartbeat:' .. component_id,
+        'file_status:' .. component_id,
+        'level_status:' .. component_id
+    )
+    local hb = decode(values[1])
+    local fs = decode(values[2])
+    local ls = decode(values[3])
+
+    if hb or fs or ls then
+        local overall = nil
+        local function merge(status)
+            if overall == nil or priority[status] < priority[overall] then
+                overall = status
+            end
+        end
+
+        local hb_status = ''
+        if hb then
+            hb_status = heartbeat_status(hb)
+            merge(hb_status)
+        end
+
+        local file_ok = -1
+        if fs then
+            file_ok = fs.overall_file_health == true and 1 or 0
+            merge(file_ok == 1 and 'healthy' or 'warning')
+        end
+
+        local level_ok = -1
+        if ls then
+            level_ok = ls.compliant == true and 1 or 0
+            merge(level_ok == 1 and 'healthy' or 'warning')
+        end
+
+        table.insert(result, { component_id, overall, hb_status, file_ok, level_ok })
+    else
+        -- 脚本原子执行，此处移除不会与心跳写入竞争
+        redis.call('SREM', KEYS[1], component_id)
+    end
+end
+
+return result
@@ -6,7 +6,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .api import heartbeat, status
-from .core.redis_client import redis_client
+from .core.redis_client import async_redis_client, redis_client
 from .services.file_checker import (
     scheduler as file_scheduler,
     start_file_checker,
@@ -28,12 +28,19 @@ async def lifespan(app: FastAPI):
     # 1. 连接 Redis
     try:
         redis_client.connect()
+        await async_redis_client.connect()
         print("✅ Redis 连接成功")
     except Exception as e:
         print(f"⚠️ Redis 连接失败: {e}")
         # 继续启动，允许在运行时再重试连接
 
-    # 2. 启动定时任务
+    # 2. 预加载状态汇总 Lua 脚本（失败时在首次请求状态汇总时再加载）
+    try:
+        await status.load_status_summary_script()
+    except Exception as e:
+        print(f"⚠️ 状态汇总脚本加载失败: {e}")
+
+    # 3. 启动定时任务
     try:
         start_file_checker()
     except Exception as e:
@@ -61,6 +68,12 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"⚠️ 停止等级验证定时任务失败: {e}")
 
+    # 关闭异步 Redis 连接池
+    try:
+        await async_redis_client.close()
+    except Exception as e:
+        print(f"⚠️ 关闭 Redis 连接池失败: {e}")
+
 
 app = FastAPI(
     title="模拟交易组件监控系统",
@@ -94,7 +107,7 @@ async def health_check():
 
     # 检查 Redis 连接
     try:
-        redis_client.get_client().ping()
+        await async_redis_client.get_client().ping()
         health_info["services"]["redis"] = "connected"
     except Exception as e:
         health_info["services"]["redis"] = f"disconnected: {e}"
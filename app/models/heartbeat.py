@@ -8,7 +8,10 @@ from pydantic import BaseModel, Field
 class HeartbeatRequest(BaseModel):
     """心跳请求体模型"""
 
-    process_exists: bool = Field(..., description="进程是否存在")
+    process_exists: bool = Field(
+        True,
+        description="进程是否存在，省略时默认为 True（能发送心跳即说明进程存在）"
+    )
     timestamp: str = Field(..., description="ISO8601 格式时间戳")
     declared_level: Optional[int] = Field(
         None,
@@ -24,5 +27,6 @@ class HeartbeatData(BaseModel):
     component_id: str
     process_exists: bool
     timestamp: str          # ISO8601
+    timestamp_epoch: Optional[float] = None  # timestamp 对应的 epoch 秒，无时区时为 None
     declared_level: Optional[int] = None
     received_at: str        # ISO8601，服务器接收时间
@@ -1,23 +1,112 @@
 """文件监控定时任务服务"""
 
+import errno
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set, Union
 
 from apscheduler.schedulers.background import BackgroundScheduler
-from croniter import croniter
 
 from ..core.config import get_file_monitor_plan
-from ..core.redis_client import redis_client
-from ..core.time_utils import get_current_time_in_timezone
+from ..core.redis_client import COMPONENTS_INDEX_KEY, encode_json, redis_client
+from ..core.time_utils import get_cron_bounds, get_current_time_in_timezone
 
 scheduler = BackgroundScheduler()
 
+# 组件检查线程池（检查以 I/O 为主，可并发）
+_component_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="file-check")
+
+# 文件 stat 线程池（stat 系统调用期间释放 GIL）
+_stat_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="file-stat")
+
+# 只有 Windows 上 os.scandir 的目录项自带 stat 信息；其他平台 DirEntry.stat()
+# 仍是每个文件一次 stat，遍历目录只会额外读取整个目录
+_SCANDIR_HAS_STAT = os.name == "nt"
+
+
+def stat_file(file_path: str) -> Union[os.stat_result, OSError]:
+    """
+    获取文件元信息（单次 stat 调用）
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        stat 结果；失败时返回对应的异常对象（如 FileNotFoundError）
+    """
+    try:
+        return os.stat(file_path)
+    except OSError as e:
+        return e
+
+
+def stat_directory_files(
+    dir_path: str,
+    names: Set[str]
+) -> Dict[str, Union[os.stat_result, OSError]]:
+    """
+    获取同一目录下多个文件的元信息
+
+    Windows 上同一目录下有多个被监控文件时遍历一次目录，直接使用目录项
+    自带的属性；其他平台（或只有一个文件时）逐个 stat，避免读取整个目录。
+
+    Args:
+        dir_path: 目录路径
+        names: 目录下需要获取的文件名
+
+    Returns:
+        文件名 -> stat 结果；失败时为对应的异常对象（如 FileNotFoundError）
+    """
+    if len(names) == 1 or not _SCANDIR_HAS_STAT:
+        return {
+            name: stat_file(os.path.join(dir_path, name))
+            for name in names
+        }
+
+    results: Dict[str, Union[os.stat_result, OSError]] = {}
+    dir_missing = False
+    try:
+        with os.scandir(dir_path or ".") as entries:
+            for entry in entries:
+                if entry.name not in names:
+                    continue
+                try:
+                    results[entry.name] = entry.stat()
+                except OSError as e:
+                    results[entry.name] = e
+    except FileNotFoundError:
+        # 目录不存在，其下文件均视为不存在
+        dir_missing = True
+    except OSError:
+        # 目录无法遍历（如只有执行权限）时逐个 stat
+        return {
+            name: stat_file(os.path.join(dir_path, name))
+            for name in names
+        }
+
+    for name in names - results.keys():
+        file_path = os.path.join(dir_path, name)
+        if dir_missing:
+            results[name] = FileNotFoundError(
+                errno.ENOENT,
+                os.strerror(errno.ENOENT),
+                file_path
+            )
+        else:
+            # 按名称精确匹配不到时逐个 stat：大小写不敏感的文件系统上
+            # 配置的文件名与实际大小写不同也能找到
+            results[name] = stat_file(file_path)
+
+    return results
+
 
 def check_file_compliance(
     file_path: str,
     expected_cron: str,
-    grace_period_sec: int
+    grace_period_sec: int,
+    file_stat: Optional[Union[os.stat_result, OSError]] = None,
+    current_time: Optional[datetime] = None
 ) -> Dict[str, Any]:
     """
     检查单个文件的更新合规性
@@ -26,38 +115,27 @@ def check_file_compliance(
         file_path: 文件绝对路径
         expected_cron: 预期更新 cron 表达式
         grace_period_sec: 宽限期（秒）
+        file_stat: 预先获取的 stat 结果，None 时在此处获取
+        current_time: 当前时间，批量检查时由调用方传入以复用，默认取当前时间
 
     Returns:
         文件状态字典
     """
-    current_time = get_current_time_in_timezone()
+    if current_time is None:
+        current_time = get_current_time_in_timezone()
 
-    # 检查文件是否存在
-    if not os.path.exists(file_path):
-        # 计算下次应更新时间
-        itr = croniter(expected_cron, current_time)
-        next_expected = itr.get_next(datetime)
+    if file_stat is None:
+        file_stat = stat_file(file_path)
 
-        return {
-            "path": file_path,
-            "last_modified": None,
-            "file_size": 0,
-            "is_compliant": False,
-            "next_expected_update": next_expected.isoformat(),
-            "alert_message": "文件不存在"
-        }
-
-    # 获取文件修改时间
-    try:
-        mtime_timestamp = os.path.getmtime(file_path)
-        last_modified = datetime.fromtimestamp(mtime_timestamp)
-        # 添加时区信息
-        last_modified = last_modified.astimezone(current_time.tzinfo)
+    # 文件不存在或无法访问
+    if isinstance(file_stat, OSError):
+        # 计算下次应更新时间
+        _, next_expected = get_cron_bounds(expected_cron, current_time)
 
-        file_size = os.path.getsize(file_path)
-    except (OSError, IOError) as e:
-        itr = croniter(expected_cron, current_time)
-        next_expected = itr.get_next(datetime)
+        if isinstance(file_stat, FileNotFoundError):
+            alert_message = "文件不存在"
+        else:
+            alert_message = f"无法访问文件: {str(file_stat)}"
 
         return {
             "path": file_path,
@@ -65,12 +143,16 @@ def check_file_compliance(
             "file_size": 0,
             "is_compliant": False,
             "next_expected_update": next_expected.isoformat(),
-            "alert_message": f"无法访问文件: {str(e)}"
+            "alert_message": alert_message
         }
 
-    # 使用 croniter 计算上次应该更新的时间
-    itr = croniter(expected_cron, current_time)
-    last_expected = itr.get_prev(datetime)
+    # 获取文件修改时间，并添加时区信息
+    last_modified = datetime.fromtimestamp(file_stat.st_mtime)
+    last_modified = last_modified.astimezone(current_time.tzinfo)
+    file_size = file_stat.st_size
+
+    # 计算上次应该更新的时间与下次应更新时间
+    last_expected, next_expected = get_cron_bounds(expected_cron, current_time)
 
     # 考虑宽限期：文件修改时间应该 >= 上次预期更新时间 - 宽限期
     grace_delta = timedelta(seconds=grace_period_sec)
@@ -78,9 +160,6 @@ def check_file_compliance(
 
     is_compliant = last_modified >= effective_deadline
 
-    # 计算下次应更新时间
-    next_expected = itr.get_next(datetime)
-
     # 生成告警信息
     alert_message = None
     if not is_compliant:
@@ -101,53 +180,67 @@ def check_file_compliance(
     }
 
 
-def update_file_status_for_component(
+def build_file_status_for_component(
     component_id: str,
     component_config: Dict
-) -> None:
+) -> Dict[str, Any]:
     """
-    更新单个组件的文件监控状态
+    计算单个组件的文件监控状态
 
     Args:
         component_id: 组件ID
         component_config: 组件配置（包含 input_files, output_files）
+
+    Returns:
+        待写入 Redis 的文件监控状态字典
     """
     current_time = get_current_time_in_timezone()
 
-    input_files_status: List[Dict[str, Any]] = []
-    output_files_status: List[Dict[str, Any]] = []
-
-    # 处理输入文件
-    for file_config in component_config.get("input_files", []):
-        file_path = file_config["path"]
-        expected_cron = file_config["expected_update_cron"]
-        grace_period = file_config.get("grace_period_sec", 60)
-
-        file_status = check_file_compliance(
-            file_path,
-            expected_cron,
-            grace_period
+    file_configs = [
+        ("input", file_config)
+        for file_config in component_config.get("input_files", [])
+    ] + [
+        ("output", file_config)
+        for file_config in component_config.get("output_files", [])
+    ]
+
+    # 按所在目录分组，各目录在线程池中并发获取文件元信息
+    names_by_dir: Dict[str, Set[str]] = {}
+    for _, file_config in file_configs:
+        dir_path, name = os.path.split(file_config["path"])
+        names_by_dir.setdefault(dir_path, set()).add(name)
+
+    stats_by_dir = dict(zip(
+        names_by_dir,
+        _stat_pool.map(
+            stat_directory_files,
+            names_by_dir.keys(),
+            names_by_dir.values()
         )
-        file_status["type"] = "input"
-        file_status["expected_update_cron"] = expected_cron
-
-        input_files_status.append(file_status)
+    ))
 
-    # 处理输出文件
-    for file_config in component_config.get("output_files", []):
+    # cron 计算为纯 CPU 操作，在当前线程执行
+    input_files_status: List[Dict[str, Any]] = []
+    output_files_status: List[Dict[str, Any]] = []
+    for file_type, file_config in file_configs:
         file_path = file_config["path"]
         expected_cron = file_config["expected_update_cron"]
-        grace_period = file_config.get("grace_period_sec", 60)
 
+        dir_path, name = os.path.split(file_path)
         file_status = check_file_compliance(
             file_path,
             expected_cron,
-            grace_period
+            file_config.get("grace_period_sec", 60),
+            stats_by_dir[dir_path][name],
+            current_time
         )
-        file_status["type"] = "output"
+        file_status["type"] = file_type
         file_status["expected_update_cron"] = expected_cron
 
-        output_files_status.append(file_status)
+        if file_type == "input":
+            input_files_status.append(file_status)
+        else:
+            output_files_status.append(file_status)
 
     # 计算整体健康状态
     all_files = input_files_status + output_files_status
@@ -162,9 +255,7 @@ def update_file_status_for_component(
         "checked_at": current_time.isoformat()
     }
 
-    # 存入 Redis
-    redis_key = f"file_status:{component_id}"
-    redis_client.set_json(redis_key, status_data)
+    return status_data
 
 
 @scheduler.scheduled_job('cron', minute='*/1')  # 每分钟执行
@@ -176,17 +267,39 @@ def scheduled_file_check() -> None:
         config = get_file_monitor_plan()
         components = config.get("components", [])
 
-        checked_count = 0
-        for component in components:
-            component_id = component.get("component_id")
-            if not component_id:
-                continue
+        # 各组件的检查在线程池中并发执行
+        futures = {
+            _component_pool.submit(
+                build_file_status_for_component,
+                component["component_id"],
+                component
+            ): component["component_id"]
+            for component in components
+            if component.get("component_id")
+        }
 
+        # 所有组件的写入合并到一个 pipeline，整个任务只需一次往返
+        pipe = redis_client.pipeline()
+        checked_ids: List[str] = []
+        for future in as_completed(futures):
+            component_id = futures[future]
             try:
-                update_file_status_for_component(component_id, component)
-                checked_count += 1
+                status_data = future.result()
             except Exception as e:
                 print(f"❌ 检查组件 {component_id} 文件状态失败: {e}")
+                continue
+
+            pipe.set(
+                f"file_status:{component_id}",
+                encode_json(status_data)
+            )
+            checked_ids.append(component_id)
+
+        if checked_ids:
+            pipe.sadd(COMPONENTS_INDEX_KEY, *checked_ids)
+            pipe.execute()
+
+        checked_count = len(checked_ids)
 
         print(f"✅ 文件监控定时任务完成: 检查了 {checked_count} 个组件")
 
@@ -1,12 +1,13 @@
 """运行等级验证定时任务服务"""
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from apscheduler.schedulers.background import BackgroundScheduler
 
 from ..core.config import get_level_schedule
-from ..core.redis_client import redis_client
+from ..core.redis_client import COMPONENTS_INDEX_KEY, encode_json, redis_client
 from ..core.time_utils import (
     find_matching_schedule_rule,
     get_current_time_in_timezone,
@@ -14,6 +15,9 @@ from ..core.time_utils import (
 
 scheduler = BackgroundScheduler()
 
+# 组件检查线程池（检查以 I/O 为主，可并发）
+_component_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="level-check")
+
 
 def get_expected_level(
     component_config: Dict,
@@ -74,16 +78,19 @@ def get_declared_level_from_heartbeat(component_id: str) -> Optional[int]:
     return declared_level
 
 
-def update_level_status_for_component(
+def build_level_status_for_component(
     component_id: str,
     component_config: Dict
-) -> None:
+) -> Dict[str, Any]:
     """
-    更新单个组件的等级验证状态
+    计算单个组件的等级验证状态
 
     Args:
         component_id: 组件ID
         component_config: 组件配置
+
+    Returns:
+        待写入 Redis 的等级验证状态字典
     """
     current_time = get_current_time_in_timezone()
 
@@ -113,9 +120,7 @@ def update_level_status_for_component(
         "last_check": current_time.isoformat()
     }
 
-    # 存入 Redis
-    redis_key = f"level_status:{component_id}"
-    redis_client.set_json(redis_key, status_data)
+    return status_data
 
 
 @scheduler.scheduled_job('cron', minute='*/1')  # 每分钟执行
@@ -127,17 +132,39 @@ def scheduled_level_check() -> None:
         config = get_level_schedule()
         components = config.get("components", [])
 
-        checked_count = 0
-        for component in components:
-            component_id = component.get("component_id")
-            if not component_id:
-                continue
-
+        # 各组件的检查在线程池中并发执行
+        futures = {
+            _component_pool.submit(
+                build_level_status_for_component,
+                component["component_id"],
+                component
+            ): component["component_id"]
+            for component in components
+            if component.get("component_id")
+        }
+
+        # 所有组件的写入合并到一个 pipeline，整个任务只需一次往返
+        pipe = redis_client.pipeline()
+        checked_ids: List[str] = []
+        for future in as_completed(futures):
+            component_id = futures[future]
             try:
-                update_level_status_for_component(component_id, component)
-                checked_count += 1
+                status_data = future.result()
             except Exception as e:
                 print(f"❌ 检查组件 {component_id} 等级状态失败: {e}")
+                continue
+
+            pipe.set(
+                f"level_status:{component_id}",
+                encode_json(status_data)
+            )
+            checked_ids.append(component_id)
+
+        if checked_ids:
+            pipe.sadd(COMPONENTS_INDEX_KEY, *checked_ids)
+            pipe.execute()
+
+        checked_count = len(checked_ids)
 
         print(f"✅ 等级验证定时任务完成: 检查了 {checked_count} 个组件")
 
@@ -1,12 +1,96 @@
 """模拟组件脚本 - 用于测试"""
 
 import argparse
+import asyncio
 import sys
 import time
 from datetime import datetime, timezone
-from typing import Optional
+from pathlib import Path
+from typing import Any, List, Optional
 
 import httpx
+import yaml
+
+from ..core.component_id import is_valid_component_id
+
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+except ImportError:  # orjson 不可用时退回标准库
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+# 心跳时间戳用到的函数和时区，绑定到模块变量省去每次的属性查找
+_utcnow = datetime.now
+_UTC = timezone.utc
+
+# 连续失败后暂停发送心跳的最长退避秒数
+MAX_BACKOFF_SEC = 60
+
+# 心跳请求头：负载已预先序列化为 JSON 字节
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# 进程内所有模拟组件共享的 HTTP 客户端
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    获取共享的 HTTP 客户端（单例）
+
+    同一进程中的多个模拟组件复用同一个连接池，而不是各自建立连接。
+
+    Returns:
+        httpx 异步客户端
+    """
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(
+                max_connections=16,
+                max_keepalive_connections=16,
+                keepalive_expiry=300
+            )
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """关闭共享的 HTTP 客户端"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def next_deadline(deadline: float, interval: float, now: float) -> float:
+    """
+    计算下一次心跳的截止时间（monotonic）
+
+    按固定间隔推进，不受发送耗时影响；落后整数个间隔时直接跳过错过的心跳，
+    而不是连续补发。
+
+    Args:
+        deadline: 刚处理完的截止时间
+        interval: 心跳间隔秒数
+        now: 当前 monotonic 时间
+
+    Returns:
+        晚于 now 的下一个截止时间
+
+    Raises:
+        ValueError: 心跳间隔不是正数
+    """
+    if interval <= 0:
+        raise ValueError(f"心跳间隔必须为正数: {interval!r}")
+    deadline += interval
+    if deadline <= now:
+        deadline += ((now - deadline) // interval + 1) * interval
+    return deadline
 
 
 class SimulatedComponent:
@@ -16,45 +100,81 @@ class SimulatedComponent:
         self,
         component_id: str,
         api_base: str = "http://localhost:8000/api/v1",
-        heartbeat_interval: int = 30
+        heartbeat_interval: int = 30,
+        client: Optional[httpx.AsyncClient] = None
     ):
         self.component_id = component_id
         self.api_base = api_base
         self.heartbeat_interval = heartbeat_interval
         self.process_exists = True
         self.declared_level: Optional[int] = 1
-        self._running = False
+        # stop() 置位后，run() 中的等待立即返回
+        self._stop_event = asyncio.Event()
+        # 预序列化的心跳负载模板及其对应的 (process_exists, declared_level)
+        self._payload_key: Optional[tuple] = None
+        self._payload_tmpl = b""
+        # 熔断状态：连续失败次数，以及在此（monotonic）时间之前跳过发送
+        self._fail_count = 0
+        self._skip_until = 0.0
+        # 默认使用进程内共享的客户端，避免每个组件单独建立连接
+        self._client = client if client is not None else get_client()
+
+    def _payload_template(self) -> bytes:
+        """
+        获取当前状态对应的心跳负载模板
 
-    def send_heartbeat(self) -> bool:
+        模板中只留下时间戳的 %s 占位，进程状态或等级变化时才重建。
+
+        Returns:
+            JSON 字节模板
+        """
+        key = (self.process_exists, self.declared_level)
+        if key != self._payload_key:
+            # process_exists 服务端默认为 True，只在模拟崩溃时才发送
+            payload = {} if self.process_exists else {"process_exists": False}
+            # 只有等级有效时才添加
+            if self.declared_level is not None:
+                payload["declared_level"] = self.declared_level
+            payload["timestamp"] = "%s"
+            self._payload_tmpl = _dumps(payload)
+            self._payload_key = key
+        return self._payload_tmpl
+
+    async def send_heartbeat(self) -> bool:
         """
         发送心跳到监控服务器
 
+        连续失败后按指数退避（最长 MAX_BACKOFF_SEC 秒）暂停发送，
+        避免服务端不可用时每次都等待连接超时。
+
         Returns:
-            是否发送成功
+            是否发送成功（退避期内直接返回 False）
         """
+        if time.monotonic() < self._skip_until:
+            return False
+
         url = f"{self.api_base}/heartbeat/{self.component_id}"
 
         # 使用带时区的时间戳（UTC）
-        payload = {
-            "process_exists": self.process_exists,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-
-        # 只有等级有效时才添加
-        if self.declared_level is not None:
-            payload["declared_level"] = self.declared_level
+        timestamp = _utcnow(_UTC).isoformat()
+        body = self._payload_template() % timestamp.encode()
 
         try:
-            response = httpx.post(url, json=payload, timeout=5.0)
+            response = await self._client.post(url, content=body, headers=_JSON_HEADERS)
             response.raise_for_status()
             print(f"✅ 心跳发送成功 [{self.component_id}] level={self.declared_level}")
+            self._fail_count = 0
             return True
         except httpx.HTTPError as e:
             print(f"❌ 心跳发送失败 [{self.component_id}]: {e}")
-            return False
         except Exception as e:
             print(f"❌ 心跳发送异常 [{self.component_id}]: {e}")
-            return False
+
+        self._fail_count += 1
+        backoff = min(MAX_BACKOFF_SEC, 2 ** self._fail_count)
+        self._skip_until = time.monotonic() + backoff
+        print(f"⏸️ 暂停发送心跳 {backoff} 秒 [{self.component_id}]")
+        return False
 
     def simulate_level_change(self, new_level: int) -> None:
         """模拟等级变更"""
@@ -77,17 +197,16 @@ class SimulatedComponent:
 
     def stop(self) -> None:
         """停止模拟组件"""
-        self._running = False
+        self._stop_event.set()
         print(f"🛑 停止模拟组件 [{self.component_id}]")
 
-    def run(self, max_iterations: Optional[int] = None) -> None:
+    async def run(self, max_iterations: Optional[int] = None) -> None:
         """
         运行模拟组件
 
         Args:
             max_iterations: 最大心跳次数，None表示无限循环
         """
-        self._running = True
         iteration = 0
 
         print(f"🚀 启动模拟组件 [{self.component_id}]")
@@ -95,23 +214,125 @@ class SimulatedComponent:
         print(f"   心跳间隔: {self.heartbeat_interval}秒")
         print(f"   初始等级: {self.declared_level}")
 
-        try:
-            while self._running:
-                # 发送心跳
-                self.send_heartbeat()
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            # 发送心跳
+            await self.send_heartbeat()
+
+            iteration += 1
+            if max_iterations is not None and iteration >= max_iterations:
+                print(f"⏹️ 达到最大迭代次数 [{self.component_id}]")
+                break
+
+            # 等待下次心跳；stop() 被调用时提前醒来
+            deadline = next_deadline(deadline, self.heartbeat_interval, time.monotonic())
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                pass
+
+
+def positive_int(value: str) -> int:
+    """
+    argparse 类型：正整数
+
+    Args:
+        value: 命令行参数字符串
+
+    Returns:
+        解析后的整数
+
+    Raises:
+        argparse.ArgumentTypeError: 不是正整数
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"应为正整数: {value!r}") from None
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"应为正整数: {value!r}")
+    return number
+
+
+def load_component_configs(path: Path) -> List[dict]:
+    """
+    从 YAML/JSON 文件加载多个模拟组件的配置
+
+    文件内容为列表，每项包含 component_id，可选 level 和 interval，例如：
+        - {component_id: trade_engine, level: 4, interval: 30}
+        - {component_id: risk_checker, level: 4}
+
+    Args:
+        path: 配置文件路径（JSON 是 YAML 的子集，可直接解析）
+
+    Returns:
+        组件配置列表
+
+    Raises:
+        ValueError: 配置格式不正确
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        configs = yaml.safe_load(f) or []
+
+    if not isinstance(configs, list):
+        raise ValueError(f"配置文件应为列表: {path}")
+    for cfg in configs:
+        _validate_component_config(cfg)
+    return configs
+
+
+def _validate_component_config(cfg: Any) -> None:
+    """
+    校验单个组件配置，规则与命令行参数及服务端校验一致
 
-                iteration += 1
-                if max_iterations is not None and iteration >= max_iterations:
-                    print(f"⏹️ 达到最大迭代次数 [{self.component_id}]")
-                    break
+    提前拒绝错误配置，避免运行中出错导致同一进程内的所有组件一起退出。
 
-                # 等待下次心跳
-                time.sleep(self.heartbeat_interval)
+    Args:
+        cfg: 配置项
 
-        except KeyboardInterrupt:
-            print(f"\n⏹️ 模拟组件被中断 [{self.component_id}]")
-        finally:
-            self._running = False
+    Raises:
+        ValueError: 配置格式不正确
+    """
+    if not isinstance(cfg, dict) or "component_id" not in cfg:
+        raise ValueError(f"组件配置缺少 component_id: {cfg}")
+
+    component_id = cfg["component_id"]
+    if not isinstance(component_id, str) or not is_valid_component_id(component_id):
+        raise ValueError(
+            f"无效的 component_id: {component_id!r}（只允许字母、数字、下划线、连字符）"
+        )
+
+    # bool 是 int 的子类，需单独排除
+    level = cfg.get("level")
+    if level is not None and (
+        not isinstance(level, int) or isinstance(level, bool) or not 1 <= level <= 4
+    ):
+        raise ValueError(f"无效的 level [{component_id}]: {level!r}（应为1-4）")
+
+    interval = cfg.get("interval")
+    if interval is not None and (
+        not isinstance(interval, int) or isinstance(interval, bool) or interval <= 0
+    ):
+        raise ValueError(f"无效的 interval [{component_id}]: {interval!r}（应为正整数）")
+
+
+async def run_many(
+    components: List[SimulatedComponent],
+    max_iterations: Optional[int] = None
+) -> None:
+    """
+    在同一个事件循环中并发运行多个模拟组件，共享一个 HTTP 客户端
+
+    Args:
+        components: 模拟组件列表
+        max_iterations: 每个组件的最大心跳次数，None表示无限循环
+    """
+    try:
+        await asyncio.gather(
+            *(component.run(max_iterations=max_iterations) for component in components)
+        )
+    finally:
+        await close_client()
 
 
 def main():
@@ -121,6 +342,7 @@ def main():
     用法：
         python -m app.sim.component_sim trade_engine --level 4 --interval 30
         python -m app.sim.component_sim risk_checker --level 4 --interval 60
+        python -m app.sim.component_sim --config components.yaml
     """
     parser = argparse.ArgumentParser(
         description="模拟交易组件 - 用于测试监控系统"
@@ -128,9 +350,17 @@ def main():
 
     parser.add_argument(
         "component_id",
+        nargs="?",
         help="组件ID（如: trade_engine, risk_checker）"
     )
 
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=None,
+        help="YAML/JSON 组件列表文件，在同一进程中启动多个组件（替代 component_id）"
+    )
+
     parser.add_argument(
         "--level",
         type=int,
@@ -141,7 +371,7 @@ def main():
 
     parser.add_argument(
         "--interval",
-        type=int,
+        type=positive_int,
         default=30,
         help="心跳间隔秒数 (默认: 30)"
     )
@@ -161,19 +391,35 @@ def main():
 
     args = parser.parse_args()
 
-    # 创建并启动模拟组件
-    component = SimulatedComponent(
-        component_id=args.component_id,
-        api_base=args.api_base,
-        heartbeat_interval=args.interval
-    )
-
-    # 设置初始等级
-    component.declared_level = args.level
+    if args.config is not None:
+        try:
+            configs = load_component_configs(args.config)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            print(f"❌ 加载组件配置失败: {e}")
+            sys.exit(1)
+    elif args.component_id:
+        configs = [{"component_id": args.component_id}]
+    else:
+        parser.error("需要指定 component_id 或 --config")
+
+    # 创建模拟组件，未配置的字段使用命令行参数
+    components = []
+    for cfg in configs:
+        component = SimulatedComponent(
+            component_id=cfg["component_id"],
+            api_base=args.api_base,
+            heartbeat_interval=cfg.get("interval", args.interval)
+        )
+        # 设置初始等级
+        component.declared_level = cfg.get("level", args.level)
+        components.append(component)
 
     # 启动
     try:
-        component.run(max_iterations=args.max_iterations)
+        asyncio.run(run_many(components, max_iterations=args.max_iterations))
+    except KeyboardInterrupt:
+        component_ids = ", ".join(c.component_id for c in components)
+        print(f"\n⏹️ 模拟组件被中断 [{component_ids}]")
     except Exception as e:
         print(f"❌ 模拟组件异常: {e}")
         sys.exit(1)
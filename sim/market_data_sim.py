@@ -6,30 +6,34 @@ Market Data Feeder Simulator
 模拟 market_data_feeder 组件，支持文件监控测试场景。
 
 Usage:
-    python sim/market_data_sim.py
+    python sim/market_data_sim.py [--verbose]
 
 Features:
     - 自动创建 ./data/market_data.csv
     - 每 30 秒发送心跳（declared_level=2）
     - 每 4 分钟更新文件内容，模拟真实数据写入
-    - 记录关键事件日志
+    - 记录关键事件日志（默认只输出警告/错误，--verbose 输出全部）
 
 Requirements:
     - Python 3.10+
-    - requests library (pip install requests)
+    - httpx library (pip install httpx)
     - FastAPI backend running on localhost:8000
 
 Author: Generated for testing file monitoring
 """
 
-import json
+import argparse
+import asyncio
 import logging
 import os
+import random
 import sys
 import time
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import TextIO
 
-import requests
+import httpx
 
 # =============================================================================
 # Configuration
@@ -39,24 +43,76 @@ COMPONENT_ID = "market_data_feeder"
 API_BASE = "http://localhost:8000/api/v1"
 HEARTBEAT_INTERVAL = 30  # seconds
 FILE_UPDATE_INTERVAL = 240  # 4 minutes (slightly less than 5min cron cycle)
+MAX_INFLIGHT_HEARTBEATS = 2  # heartbeats allowed to overlap when the backend is slow
 
 # File path (relative to project root)
 DATA_FILE = "./data/market_data.csv"
+DATA_FILE_MAX_BYTES = 1 << 20  # rotate to DATA_FILE + ".1" beyond 1 MiB
 DECLARED_LEVEL = 2
 
+# Random market data generation
+_SYMBOLS = ("AAPL", "GOOGL", "MSFT", "TSLA", "AMZN")
+_RNG = random.Random()
+
+# Heartbeat body, pre-serialized; only the timestamp and level are filled in per call
+# (process_exists is omitted: the server defaults it to true)
+_HEARTBEAT_TEMPLATE = b'{"timestamp":"%s","declared_level":%d}'
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 # Logging setup
+# Only warnings and errors by default; pass --verbose for per-event INFO logs
 logging.basicConfig(
-    level=logging.INFO,
+    level=logging.WARNING,
     format='%(asctime)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 logger = logging.getLogger(__name__)
+# httpx logs every request at INFO; keep the simulator output to our own events
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+_RULE = "=" * 60
 
 
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
+# Bound once so each timestamp skips the attribute lookups
+_fromtimestamp = datetime.fromtimestamp
+_UTC = timezone.utc
+
+
+def _utc_iso(ts: float) -> str:
+    """Format a POSIX timestamp as a UTC ISO-8601 string."""
+    return _fromtimestamp(ts, _UTC).isoformat()
+
+
+def next_deadline(deadline: float, interval: float, now: float) -> float:
+    """
+    Advance a monotonic schedule deadline by one interval.
+    
+    If the loop fell behind by whole intervals (e.g. the process was
+    suspended), the missed slots are skipped rather than fired back to back.
+    
+    Args:
+        deadline: Deadline that was just serviced
+        interval: Seconds between runs
+        now: Current monotonic time
+        
+    Returns:
+        The next deadline, always later than `now`
+        
+    Raises:
+        ValueError: interval is not positive
+    """
+    if interval <= 0:
+        raise ValueError(f"interval must be positive: {interval!r}")
+    deadline += interval
+    if deadline <= now:
+        deadline += ((now - deadline) // interval + 1) * interval
+    return deadline
+
+
 def ensure_file_exists(file_path: str) -> bool:
     """
     Ensure the data file exists. Create directory and file if not present.
@@ -67,66 +123,60 @@ def ensure_file_exists(file_path: str) -> bool:
     Returns:
         True if file exists or was created successfully
     """
+    path = Path(file_path)
     try:
         # Create directory if needed
-        dir_path = os.path.dirname(file_path)
-        if dir_path and not os.path.exists(dir_path):
-            os.makedirs(dir_path, exist_ok=True)
-            logger.info(f"Created directory: {dir_path}")
+        path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Create file if it doesn't exist
-        if not os.path.exists(file_path):
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write("timestamp,symbol,price,volume\n")
-                f.write(f"{datetime.now(timezone.utc).isoformat()},AAPL,150.00,1000\n")
-            logger.info(f"Created initial file: {file_path}")
+        # Create file only if it doesn't exist ('x' fails atomically otherwise)
+        try:
+            with path.open('x', encoding='utf-8') as f:
+                f.write(f"timestamp,symbol,price,volume\n{_utc_iso(time.time())},AAPL,150.00,1000\n")
+            logger.info("Created initial file: %s", file_path)
+        except FileExistsError:
+            pass
         
         return True
         
     except OSError as e:
-        logger.error(f"Failed to create file {file_path}: {e}")
+        logger.error("Failed to create file %s: %s", file_path, e)
         return False
 
 
-def update_file(file_path: str) -> bool:
+def update_file(fh: TextIO) -> bool:
     """
-    Update the data file with new content and fresh mtime.
+    Append a new data row to the open data file.
     
     Args:
-        file_path: Path to the file
+        fh: Line-buffered append handle to the data file (see
+            open_data_file); each row is flushed as it is written
         
     Returns:
         True if update was successful
     """
     try:
         # Generate new data row
-        now = datetime.now(timezone.utc)
-        symbols = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN"]
-        import random
-        symbol = random.choice(symbols)
-        price = round(random.uniform(100, 500), 2)
-        volume = random.randint(1000, 100000)
-        
-        # Append new data
-        with open(file_path, 'a', encoding='utf-8') as f:
-            f.write(f"{now.isoformat()},{symbol},{price},{volume}\n")
+        symbol = _RNG.choice(_SYMBOLS)
+        price = round(_RNG.uniform(100, 500), 2)
+        volume = _RNG.randint(1000, 100000)
         
-        # Update file mtime by touching it
-        os.utime(file_path, None)
+        # Append new data (the write itself bumps the file's mtime)
+        fh.write(f"{_utc_iso(time.time())},{symbol},{price},{volume}\n")
         
-        logger.info(f"File updated: {file_path} - Added {symbol} @ ${price}")
+        logger.info("File updated: %s - Added %s @ $%s", fh.name, symbol, price)
         return True
         
     except (OSError, IOError) as e:
-        logger.error(f"Failed to update file {file_path}: {e}")
+        logger.error("Failed to update file %s: %s", fh.name, e)
         return False
 
 
-def send_heartbeat(component_id: str, level: int, api_base: str) -> bool:
+async def send_heartbeat(client: httpx.AsyncClient, component_id: str, level: int, api_base: str) -> bool:
     """
     Send heartbeat to FastAPI backend.
     
     Args:
+        client: Shared async HTTP client
         component_id: Component identifier
         level: Declared run level
         api_base: API base URL
@@ -136,79 +186,173 @@ def send_heartbeat(component_id: str, level: int, api_base: str) -> bool:
     """
     url = f"{api_base}/heartbeat/{component_id}"
     
-    payload = {
-        "process_exists": True,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "declared_level": level
-    }
+    body = _HEARTBEAT_TEMPLATE % (_utc_iso(time.time()).encode(), level)
     
     try:
-        response = requests.post(
-            url,
-            json=payload,
-            timeout=5.0,
-            headers={"Content-Type": "application/json"}
-        )
+        response = await client.post(url, content=body, headers=_JSON_HEADERS)
         response.raise_for_status()
-        logger.info(f"Heartbeat sent: {component_id} (level={level})")
+        logger.info("Heartbeat sent: %s (level=%s)", component_id, level)
         return True
         
-    except requests.exceptions.ConnectionError:
-        logger.warning(f"Cannot connect to backend at {api_base}")
+    except httpx.ConnectError:
+        logger.warning("Cannot connect to backend at %s", api_base)
         return False
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.warning("Heartbeat request timed out")
         return False
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Heartbeat failed: {e}")
+    except httpx.HTTPError as e:
+        logger.error("Heartbeat failed: %s", e)
         return False
 
 
+async def heartbeat_loop(
+    client: httpx.AsyncClient,
+    component_id: str,
+    level: int,
+    api_base: str,
+    interval: float
+) -> None:
+    """
+    Send a heartbeat every `interval` seconds.
+    
+    Args:
+        client: Shared async HTTP client
+        component_id: Component identifier
+        level: Declared run level
+        api_base: API base URL
+        interval: Seconds between heartbeats
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time()
+    # Heartbeats run as background tasks so a slow backend never holds up the
+    # schedule; at most MAX_INFLIGHT_HEARTBEATS are outstanding at once
+    in_flight: set = set()
+    try:
+        while True:
+            if len(in_flight) < MAX_INFLIGHT_HEARTBEATS:
+                task = asyncio.create_task(send_heartbeat(client, component_id, level, api_base))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            else:
+                logger.warning("Skipping heartbeat: %d requests still in flight", len(in_flight))
+            # Sleep until the next deadline on the monotonic loop clock
+            deadline = next_deadline(deadline, interval, loop.time())
+            await asyncio.sleep(deadline - loop.time())
+    finally:
+        # Don't leave requests running against a client that is about to close
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+def open_data_file(file_path: str) -> TextIO:
+    """
+    Open the data file for appending, line-buffered so each row is flushed.
+    
+    Args:
+        file_path: Path to the file
+        
+    Returns:
+        Append handle to the file
+    """
+    return open(file_path, 'a', encoding='utf-8', buffering=1)
+
+
+def rotate_file(fh: TextIO) -> TextIO:
+    """
+    Move the data file aside to `<name>.1` and start a fresh one.
+    
+    Args:
+        fh: Current append handle; closed by this function
+        
+    Returns:
+        Append handle to the new data file
+    """
+    file_path = fh.name
+    fh.close()
+    try:
+        os.replace(file_path, file_path + ".1")
+        logger.info("Rotated data file: %s -> %s.1", file_path, file_path)
+    except OSError as e:
+        logger.error("Failed to rotate file %s: %s", file_path, e)
+    ensure_file_exists(file_path)
+    return open_data_file(file_path)
+
+
+async def file_update_loop(file_path: str, interval: float) -> None:
+    """
+    Append a new row to the data file every `interval` seconds, rotating it
+    once it grows past DATA_FILE_MAX_BYTES.
+    
+    Args:
+        file_path: Path to the file
+        interval: Seconds between updates
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time()
+    # Keep the data file open instead of reopening it per row
+    fh = open_data_file(file_path)
+    try:
+        while True:
+            # In append mode tell() is the current file size, no stat needed
+            if fh.tell() >= DATA_FILE_MAX_BYTES:
+                fh = rotate_file(fh)
+            update_file(fh)
+            deadline = next_deadline(deadline, interval, loop.time())
+            await asyncio.sleep(deadline - loop.time())
+    finally:
+        fh.close()
+
+
 # =============================================================================
 # Main Loop
 # =============================================================================
 
+async def run() -> None:
+    """Run the heartbeat and file update loops concurrently on one event loop."""
+    # httpx drops idle connections after 5s by default, well before the next
+    # heartbeat; keep them long enough to be reused across intervals
+    limits = httpx.Limits(max_keepalive_connections=8, keepalive_expiry=120)
+    async with httpx.AsyncClient(timeout=5.0, limits=limits) as client:
+        await asyncio.gather(
+            heartbeat_loop(client, COMPONENT_ID, DECLARED_LEVEL, API_BASE, HEARTBEAT_INTERVAL),
+            file_update_loop(DATA_FILE, FILE_UPDATE_INTERVAL),
+        )
+
+
 def main():
-    """Main execution loop."""
-    logger.info("=" * 60)
-    logger.info(f"Starting {COMPONENT_ID} simulator")
-    logger.info(f"  API Base: {API_BASE}")
-    logger.info(f"  Data File: {DATA_FILE}")
-    logger.info(f"  Heartbeat Interval: {HEARTBEAT_INTERVAL}s")
-    logger.info(f"  File Update Interval: {FILE_UPDATE_INTERVAL}s")
-    logger.info("=" * 60)
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=f"{COMPONENT_ID} simulator")
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="log heartbeats and file updates (INFO level)"
+    )
+    args = parser.parse_args()
+    if args.verbose:
+        logging.getLogger().setLevel(logging.INFO)
+    
+    logger.info(_RULE)
+    logger.info("Starting %s simulator", COMPONENT_ID)
+    logger.info("  API Base: %s", API_BASE)
+    logger.info("  Data File: %s", DATA_FILE)
+    logger.info("  Heartbeat Interval: %ss", HEARTBEAT_INTERVAL)
+    logger.info("  File Update Interval: %ss", FILE_UPDATE_INTERVAL)
+    logger.info(_RULE)
     
     # Ensure data file exists
     if not ensure_file_exists(DATA_FILE):
         logger.error("Failed to initialize data file. Exiting.")
         sys.exit(1)
     
-    # Track last execution times
-    last_heartbeat = 0
-    last_file_update = 0
-    
     try:
-        while True:
-            current_time = time.time()
-            
-            # Send heartbeat every HEARTBEAT_INTERVAL seconds
-            if current_time - last_heartbeat >= HEARTBEAT_INTERVAL:
-                send_heartbeat(COMPONENT_ID, DECLARED_LEVEL, API_BASE)
-                last_heartbeat = current_time
-            
-            # Update file every FILE_UPDATE_INTERVAL seconds
-            if current_time - last_file_update >= FILE_UPDATE_INTERVAL:
-                update_file(DATA_FILE)
-                last_file_update = current_time
-            
-            # Small sleep to prevent CPU spinning
-            time.sleep(1)
+        asyncio.run(run())
             
     except KeyboardInterrupt:
         logger.info("\nShutting down gracefully...")
         sys.exit(0)
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         sys.exit(1)
 
 